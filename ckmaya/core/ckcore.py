@@ -1,3 +1,4 @@
+import contextlib
 import json
 import os
 import shutil
@@ -12,6 +13,21 @@ from maya import cmds, mel
 
 IMAGE_MAGICK_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'bin', 'imagemagick')
 MAX_PARTITION_INFLUENCES = 80
+PACKAGE_EXTENSIONS = ('.hkx', '.nif', '.esp', '.dds', '.txt')
+REFRESH_SUSPEND_DEPTH = 0
+
+
+def _basename(node):
+    """
+    Strips the dag path and namespace from a node name.
+
+    Args:
+        node(str): A node name.
+
+    Returns:
+        str: The node name without parents or namespaces.
+    """
+    return node[max(node.rfind('|'), node.rfind(':')) + 1:]
 
 
 def copyTagAttribiutes(srcRoot, dstRoot):
@@ -50,17 +66,39 @@ def bindSkeletons(srcRoot, dstRoot):
         list: A list of constraints created.
     """
     constraints = []
-    constraints.append(cmds.parentConstraint(srcRoot, dstRoot)[0])
-    srcChildren = {child.split('|')[-1].split(':')[-1]: child
-                   for child in cmds.listRelatives(srcRoot, type='joint', fullPath=True) or []}
-    dstChildren = {child.split('|')[-1].split(':')[-1]: child
-                   for child in cmds.listRelatives(dstRoot, type='joint', fullPath=True) or []}
-    for name in srcChildren:
-        if name in dstChildren:
-            constraints.extend(bindSkeletons(srcChildren[name], dstChildren[name]))
+    pairs = [(srcRoot, dstRoot)]
+    while pairs:
+        srcJoint, dstJoint = pairs.pop()
+        constraints.append(cmds.parentConstraint(srcJoint, dstJoint)[0])
+        srcChildren = {_basename(child): child
+                       for child in cmds.listRelatives(srcJoint, type='joint', fullPath=True) or []}
+        for child in cmds.listRelatives(dstJoint, type='joint', fullPath=True) or []:
+            name = _basename(child)
+            if name in srcChildren:
+                pairs.append((srcChildren[name], child))
     return constraints
 
 
+@contextlib.contextmanager
+def suspendRefresh():
+    """
+    Suspends viewport refreshes until the outermost suspendRefresh block exits.
+
+    Maya's refresh suspend is a single flag, so nested blocks only count their depth
+    and leave the flag set for the enclosing block.
+    """
+    global REFRESH_SUSPEND_DEPTH
+    if REFRESH_SUSPEND_DEPTH == 0:
+        cmds.refresh(suspend=True)
+    REFRESH_SUSPEND_DEPTH += 1
+    try:
+        yield
+    finally:
+        REFRESH_SUSPEND_DEPTH -= 1
+        if REFRESH_SUSPEND_DEPTH == 0:
+            cmds.refresh(suspend=False)
+
+
 def getDefaultTimeRange():
     """
     Gets the default start and end time.
@@ -114,7 +152,7 @@ def getRootJoint(nodes=None, namespace=None):
     else:
         # Otherwise search the nodes for the joint
         for node in nodes:
-            if node.split('|')[-1].split(':')[-1] == exportJointName:
+            if _basename(node) == exportJointName:
                 return node
         raise Exception('Could not find root joint in nodes with name "%s"' % exportJointName)
 
@@ -127,13 +165,10 @@ def bakeSkeleton(root, time=None):
         root(str): A root joint.
         time(tuple): The start and end times.
     """
-    try:
-        cmds.refresh(su=True)
+    with suspendRefresh():
         time = time or getDefaultTimeRange()
         joints = getSkeleton(root)
         cmds.bakeResults(joints, at=['tx', 'ty', 'tz', 'rx', 'ry', 'rz'], t=time, simulation=True)
-    finally:
-        cmds.refresh(su=False)
 
 
 def importFbx(filepath, update=False, take=None):
@@ -153,25 +188,19 @@ def importFbx(filepath, update=False, take=None):
     if not os.path.exists(filepath):
         raise FbxException('Path "%s" does not exist' % filepath)
 
-    mObjects = []
+    mObjectHandles = []
 
     def addNode(mObject, *args):
-        """ A function that stores all added nodes. """
-        if mObject.isNull():
-            return
-        mObjectHandle = om2.MObjectHandle(mObject)
-        if not mObjectHandle.isAlive():
-            return
-        if not mObjectHandle.isValid():
-            return
-        mObjects.append((mObjectHandle, mObject))
+        """ A function that stores all added nodes. Validity is checked once the import finishes. """
+        mObjectHandles.append(om2.MObjectHandle(mObject))
 
     # Create a callback to listen for new nodes.
     callback = om2.MDGMessage.addNodeAddedCallback(addNode, 'dependNode')
     try:
         # Import the file
-        cmds.unloadPlugin('fbxmaya')
-        cmds.loadPlugin('fbxmaya')
+        if not cmds.pluginInfo('fbxmaya', query=True, loaded=True):
+            cmds.loadPlugin('fbxmaya')
+        mel.eval('FBXResetImport')
         mel.eval('FBXImportMode -v %s' % ('exmerge' if update else 'add'))
         mel.eval('FBXImportFillTimeline -v true')
         if take is not None:
@@ -184,13 +213,14 @@ def importFbx(filepath, update=False, take=None):
 
     # Convert mObjects to node names
     nodes = set()
-    for mObjectHandle, mObject in mObjects:
-        if mObject.isNull():
-            continue
+    for mObjectHandle in mObjectHandles:
         if not mObjectHandle.isAlive():
             continue
         if not mObjectHandle.isValid():
             continue
+        mObject = mObjectHandle.object()
+        if mObject.isNull():
+            continue
         if mObject.hasFn(om2.MFn.kDagNode):
             name = om2.MFnDagNode(mObject).fullPathName()
         else:
@@ -214,7 +244,7 @@ def exportFbx(nodes, path):
     """
 
     # Determine what nodes we're exporting
-    nodes = [node for node in nodes if 'shape' not in cmds.nodeType(node, i=True)]
+    nodes = [node for node in nodes if not getMObject(node).hasFn(om2.MFn.kShape)]
 
     try:
         cmds.undoInfo(openChunk=True)
@@ -246,13 +276,10 @@ def bakeAnimation(nodes):
     Args:
         nodes(list): A list of nodes.
     """
-    try:
-        cmds.refresh(su=True)
+    with suspendRefresh():
         start = cmds.playbackOptions(minTime=True, q=True)
         end = cmds.playbackOptions(maxTime=True, q=True)
         cmds.bakeResults(nodes, at=['tx', 'ty', 'tz', 'rx', 'ry', 'rz'], t=(start, end), simulation=True)
-    finally:
-        cmds.refresh(su=False)
 
 
 def importAnimationTags(animation):
@@ -284,7 +311,7 @@ def testImportMapping():
     """
     Creates a new scene to test the project import mapping.
     """
-    project = ckproject.getProject()
+    project = ckproject.getProject().snapshot()
     skeletonScene = project.getSkeletonScene()
     exportJointName = project.getExportJointName()
 
@@ -295,11 +322,8 @@ def testImportMapping():
     rigNodes = cmds.file(skeletonScene, reference=True, namespace='RIG', returnNewNodes=True)
 
     # Find the referenced root joint
-    referenceRoot = None
-    for name in rigNodes:
-        nodeName = name.split('|')[-1].split(':')[-1]
-        if nodeName == exportJointName:
-            referenceRoot = name
+    referenceRoot = next((name for name in rigNodes
+                          if _basename(name) == exportJointName), None)
     if referenceRoot is None:
         raise BaseException('Could not find export joint in referenced skeleton.')
 
@@ -311,12 +335,11 @@ def testImportMapping():
     dupSkeleton = [dupRoot] + cmds.listRelatives(dupRoot, type='joint', ad=True, fullPath=True) or []
 
     # Ensure joints are in the same pose
+    jointNames = {}
+    for joint in joints:
+        jointNames.setdefault(_basename(joint), []).append(joint)
     for dupJoint in dupSkeleton:
-        for joint in joints:
-            jointName = joint.split('|')[-1].split(':')[-1]
-            dupJointName = dupJoint.split('|')[-1].split(':')[-1]
-            if jointName != dupJointName:
-                continue
+        for joint in jointNames.get(_basename(dupJoint), []):
             for attr in ['tx', 'ty', 'tz', 'rx', 'ry', 'rz']:
                 cmds.setAttr('%s.%s' % (dupJoint, attr), cmds.getAttr('%s.%s' % (joint, attr)))
 
@@ -364,7 +387,7 @@ def importAnimation(animation, animationTags=None):
         animation(str): An fbx or hkx animation file to import.
         animationTags(str): An optional fbx file to import animation tags from.
     """
-    project = ckproject.getProject()
+    project = ckproject.getProject().snapshot()
     skeletonScene = project.getSkeletonScene()
     animationDir = project.getAnimationSceneDirectory()
     importJointName = project.getImportJointName()
@@ -401,91 +424,93 @@ def importAnimation(animation, animationTags=None):
     # Check if an animation already exists
     newAnimation = os.path.join(animationDir, '.'.join([os.path.basename(animation).split('.')[0], 'ma']))
 
-    # Create a new scene
-    cmds.file(new=True, force=True, prompt=False)
+    # Disable undo while building the animation scene, it is never undone
+    undoState = cmds.undoInfo(query=True, state=True)
+    cmds.undoInfo(state=False)
+    try:
+        # Create a new scene
+        cmds.file(new=True, force=True, prompt=False)
 
-    # Reference the animation rig
-    rigNodes = cmds.file(skeletonScene, reference=True, namespace='RIG', returnNewNodes=True)
+        # Reference the animation rig
+        rigNodes = cmds.file(skeletonScene, reference=True, namespace='RIG', returnNewNodes=True)
 
-    # Find the referenced root joint
-    referenceRoot = None
-    for name in rigNodes:
-        nodeName = name.split('|')[-1].split(':')[-1]
-        if nodeName == importJointName:
-            referenceRoot = name
-    if referenceRoot is None:
-        raise BaseException('Could not find export joint in referenced skeleton.')
+        # Find the referenced root joint
+        referenceRoot = next((name for name in rigNodes
+                              if _basename(name) == importJointName), None)
+        if referenceRoot is None:
+            raise BaseException('Could not find export joint in referenced skeleton.')
 
-    # Duplicate the root joint
-    dupRoot = cmds.duplicate(referenceRoot)[0]
-    joints = [referenceRoot] + cmds.listRelatives(referenceRoot, type='joint', ad=True, fullPath=True) or []
-    dupSkeleton = [dupRoot] + cmds.listRelatives(dupRoot, type='joint', ad=True, fullPath=True) or []
+        # Duplicate the root joint
+        dupRoot = cmds.duplicate(referenceRoot)[0]
+        joints = [referenceRoot] + cmds.listRelatives(referenceRoot, type='joint', ad=True, fullPath=True) or []
+        dupSkeleton = [dupRoot] + cmds.listRelatives(dupRoot, type='joint', ad=True, fullPath=True) or []
 
-    # Ensure joints are in the same pose
-    for dupJoint in dupSkeleton:
+        # Ensure joints are in the same pose
+        jointNames = {}
         for joint in joints:
-            jointName = joint.split('|')[-1].split(':')[-1]
-            dupJointName = dupJoint.split('|')[-1].split(':')[-1]
-            if jointName != dupJointName:
-                continue
-            for attr in ['tx', 'ty', 'tz', 'rx', 'ry', 'rz']:
-                cmds.setAttr('%s.%s' % (dupJoint, attr), cmds.getAttr('%s.%s' % (joint, attr)))
-
-    # Bind Rig to joints
-    controls = []
-    for joint in dupSkeleton:
-        jointName = joint.split('|')[-1]
-        jointControls = project.getJointControls(jointName)
-
-        # If no controls are mapped to the joint, skip it
-        if len(jointControls) == 0:
-            continue
-            # jointControls = [jointName]
-
-        for control in jointControls:
-            control = 'RIG:%s' % control
-            if not cmds.objExists(control):
-                cmds.warning('Warning: %s does not exist, skipping.' % control)
+            jointNames.setdefault(_basename(joint), []).append(joint)
+        for dupJoint in dupSkeleton:
+            for joint in jointNames.get(_basename(dupJoint), []):
+                for attr in ['tx', 'ty', 'tz', 'rx', 'ry', 'rz']:
+                    cmds.setAttr('%s.%s' % (dupJoint, attr), cmds.getAttr('%s.%s' % (joint, attr)))
+
+        # Bind Rig to joints
+        controls = []
+        for joint in dupSkeleton:
+            jointName = joint.split('|')[-1]
+            jointControls = project.getJointControls(jointName)
+
+            # If no controls are mapped to the joint, skip it
+            if len(jointControls) == 0:
                 continue
-
-            skipTranslate = []
-            for attr in ['tx', 'ty', 'tz']:
-                if not cmds.getAttr('%s.%s' % (control, attr), settable=True):
-                    skipTranslate.append(attr[-1])
-
-            skipRotate = []
-            for attr in ['rx', 'ry', 'rz']:
-                if not cmds.getAttr('%s.%s' % (control, attr), settable=True):
-                    skipRotate.append(attr[-1])
-
-            cmds.parentConstraint(
-                joint, control,
-                sr=skipRotate,
-                st=skipTranslate,
-                mo=True
-            )
-            controls.append(control)
-
-    # Import animation
-    importFbx(animation, update=True)
-
-    # Ensure the framerate is 30fps
-    cmds.currentUnit(time='ntsc')
-
-    # Bake controls animation
-    if len(controls) > 0:
-        bakeAnimation(controls)
-
-    # Delete import skeleton
-    cmds.delete(dupRoot)
-
-    # If an tag file exists, import tags
-    # if animationTags is not None:
-    #     importAnimationTags(animationTags)
-
-    # Save scene
-    cmds.file(rename=newAnimation)
-    cmds.file(save=True, type="mayaAscii")
+                # jointControls = [jointName]
+
+            for control in jointControls:
+                control = 'RIG:%s' % control
+                if not cmds.objExists(control):
+                    cmds.warning('Warning: %s does not exist, skipping.' % control)
+                    continue
+
+                skipTranslate = []
+                for attr in ['tx', 'ty', 'tz']:
+                    if not cmds.getAttr('%s.%s' % (control, attr), settable=True):
+                        skipTranslate.append(attr[-1])
+
+                skipRotate = []
+                for attr in ['rx', 'ry', 'rz']:
+                    if not cmds.getAttr('%s.%s' % (control, attr), settable=True):
+                        skipRotate.append(attr[-1])
+
+                cmds.parentConstraint(
+                    joint, control,
+                    sr=skipRotate,
+                    st=skipTranslate,
+                    mo=True
+                )
+                controls.append(control)
+
+        # Import animation
+        importFbx(animation, update=True)
+
+        # Ensure the framerate is 30fps
+        cmds.currentUnit(time='ntsc')
+
+        # Bake controls animation
+        if len(controls) > 0:
+            bakeAnimation(controls)
+
+        # Delete import skeleton
+        cmds.delete(dupRoot)
+
+        # If an tag file exists, import tags
+        # if animationTags is not None:
+        #     importAnimationTags(animationTags)
+
+        # Save scene
+        cmds.file(rename=newAnimation)
+        cmds.file(save=True, type="mayaAscii")
+    finally:
+        cmds.undoInfo(state=undoState)
 
 
 def moveSkeletonAnimation(root, oldTime, newTime):
@@ -589,7 +614,7 @@ def exportAnimation(name=None, time=None, format=None):
     start, end = time
 
     # Get project data
-    project = ckproject.getProject()
+    project = ckproject.getProject().snapshot()
     exportSkeletonHkxFile = project.getExportAnimationSkeletonHkx()
     exportBehaviorDir = project.getExportBehaviorDirectory()
     exportCacheFile = project.getExportCacheFile()
@@ -622,7 +647,7 @@ def exportAnimation(name=None, time=None, format=None):
 
         # Create a duplicate root joint
         dupExportJoint = cmds.duplicate(exportJoint)[0]
-        cmds.rename(dupExportJoint, exportJoint.split('|')[-1].split(':')[-1])
+        cmds.rename(dupExportJoint, _basename(exportJoint))
 
         # Copy animation tags
         copyTagAttribiutes(exportJoint, dupExportJoint)
@@ -745,6 +770,30 @@ def convertTexture(filepath, format='dds'):
     return outpath
 
 
+def convertTextures(filepaths, format='dds'):
+    """
+    Runs imagemagick once per directory to convert several textures to the specified format.
+
+    Args:
+        filepaths(list[str]): A list of texture filepaths.
+        format(str): The file extension to convert to.
+
+    Returns:
+        list[str]: The output file paths.
+    """
+    format = format.split('.')[-1]
+    directories = {}
+    for filepath in filepaths:
+        directories.setdefault(os.path.dirname(filepath), []).append(filepath)
+    for directory, textures in directories.items():
+        command = '%s -auto-orient -format %s %s' % (
+            os.path.join(IMAGE_MAGICK_DIR, 'mogrify.exe'), format,
+            ' '.join('"%s"' % texture for texture in textures)
+        )
+        ckcmd.run_command(command, directory=directory)
+    return ['%s.%s' % (filepath.split('.')[0], format) for filepath in filepaths]
+
+
 def getMaterial(mesh):
     """
     Gets a blinn material assigned to a mesh.
@@ -780,12 +829,12 @@ def setTextures(mesh, albedo=None, normal=None, emissive=None, cubemap=None, met
     """
 
     # Copy textures to texture directory
-    # textureDirectory = ckproject.getProject().getTextureDirectory()
-    # if textureDirectory not in albedo:
+    # textureDirectory = os.path.normpath(ckproject.getProject().getTextureDirectory())
+    # if os.path.commonpath([textureDirectory, os.path.normpath(albedo)]) != textureDirectory:
     #     newpath = os.path.join(textureDirectory, os.path.basename(albedo))
     #     shutil.copyfile(albedo, newpath)
     #     albedo = newpath
-    # if textureDirectory not in normal:
+    # if os.path.commonpath([textureDirectory, os.path.normpath(normal)]) != textureDirectory:
     #     newpath = os.path.join(textureDirectory, os.path.basename(normal))
     #     shutil.copyfile(normal, newpath)
     #     normal = newpath
@@ -915,8 +964,15 @@ def createJointControlMapping(joint=None, controls=None):
         return None, None
 
     # Get the current selection
-    selectedTransforms = cmds.ls(sl=True, exactType='transform', long=True) or []
-    selectedJoints = cmds.ls(sl=True, exactType='joint', long=True) or []
+    selectedTransforms = []
+    selectedJoints = []
+    selection = om2.MGlobal.getActiveSelectionList()
+    for i in range(selection.length()):
+        apiType = selection.getDependNode(i).apiType()
+        if apiType == om2.MFn.kJoint:
+            selectedJoints.append(selection.getDagPath(i).fullPathName())
+        elif apiType == om2.MFn.kTransform:
+            selectedTransforms.append(selection.getDagPath(i).fullPathName())
 
     # Get a joint to map
     if joint is None:
@@ -934,8 +990,7 @@ def createJointControlMapping(joint=None, controls=None):
         return cmds.warning('No controls selected.')
 
     # Map each control
-    for control in controls:
-        project.setControlJoint(control.split('|')[-1].split(':')[-1], joint.split('|')[-1].split(':')[-1])
+    project.setControlJoints({_basename(control): _basename(joint) for control in controls})
 
 
 def getJointMappingFromSelection(root):
@@ -1698,13 +1753,14 @@ def exportPackage():
     exportFiles = []
     for root, dirs, files in os.walk(exportDirectory):
         for filename in files:
-            if any([filename.endswith(extension) for extension in ['.hkx', '.nif', '.esp', '.dds', '.txt']]):
+            if filename.endswith(PACKAGE_EXTENSIONS):
                 exportFiles.append(os.path.join(root, filename).replace(exportDirectory, ''))
 
     # Copy files
+    packagePaths = ckproject.getProject().getExportPackageDirectories()
     for path in exportFiles:
         srcPath = os.path.join(exportDirectory, path)
-        for packagePath in ckproject.getProject().getExportPackageDirectories():
+        for packagePath in packagePaths:
             dstPath = os.path.join(packagePath, path)
             if not os.path.exists(os.path.dirname(dstPath)):
                 os.makedirs(os.path.dirname(dstPath))
@@ -1,5 +1,8 @@
 """ Utilities for interacting with nif files. """
+import functools
+import io
 import os.path
+from collections import defaultdict
 
 import pyffi
 from pyffi.spells.nif import NifSpell
@@ -11,6 +14,10 @@ import maya.api.OpenMaya as om2
 from . import ckcore, ckproject
 
 
+MAYA_NAME_TABLE = str.maketrans({' ': '_s_', '[': '_ob_', ']': '_cb_'})
+NIF_PATH_TABLE = bytes.maketrans(b'/', b'\\')
+
+
 def loadNif(filepath):
     """
     Loads data from a nif file.
@@ -23,7 +30,10 @@ def loadNif(filepath):
     """
     data = NifFormat.Data()
     with open(filepath, "rb") as openfile:
-        data.read(openfile)
+        data.read(io.BytesIO(openfile.read()))
+
+    # Cache node lookups by type, see getNiNodes
+    data._ck_index = {}
     return data
 
 
@@ -35,10 +45,13 @@ def saveNif(data, filepath):
         data(NifFormat.Data): Nif data.
         filepath(str): A nif filepath.
     """
+    stream = io.BytesIO()
+    data.write(stream)
     with open(filepath, 'wb') as openfile:
-        data.write(openfile)
+        openfile.write(stream.getvalue())
 
 
+@functools.lru_cache(maxsize=4096)
 def toMayaName(name):
     """
     Converts a name from nif format to maya format using a simple wildcard system.
@@ -49,10 +62,7 @@ def toMayaName(name):
     Returns:
         str: A Maya name.
     """
-    name = name.replace(' ', '_s_')
-    name = name.replace('[', '_ob_')
-    name = name.replace(']', '_cb_')
-    return name
+    return name.translate(MAYA_NAME_TABLE)
 
 
 def toMayaPosition(point):
@@ -82,9 +92,30 @@ def getTriangleVertices(triangle):
     return [triangle.v_1, triangle.v_2, triangle.v_3]
 
 
+def _iterNiNodes(data, node_type):
+    """
+    Iterates over nodes from nif data of a given type.
+
+    Args:
+        data(NifFormat.Data): Nif data.
+        node_type(type): A nif node type.
+
+    Returns:
+        generator: A generator of nodes.
+    """
+    if getattr(data, '_ck_index', None) is not None:
+        for branch in getNiNodes(data, node_type):
+            yield branch
+        return
+    for branch in data.get_global_iterator():
+        if isinstance(branch, node_type):
+            yield branch
+
+
 def getNiNodes(data, node_type):
     """
     Gets all nodes from nif data of a given type.
+    Data loaded with loadNif caches the result for each type, so nodes added afterwards are not returned.
 
     Args:
         data(NifFormat.Data): Nif data.
@@ -93,11 +124,12 @@ def getNiNodes(data, node_type):
     Returns:
         list[NifFormat.NiNode]: nodes.
     """
-    branches = []
-    for branch in data.get_global_iterator():
-        if isinstance(branch, node_type):
-            branches.append(branch)
-    return branches
+    index = getattr(data, '_ck_index', None)
+    if index is None:
+        return [branch for branch in data.get_global_iterator() if isinstance(branch, node_type)]
+    if node_type not in index:
+        index[node_type] = [branch for branch in data.get_global_iterator() if isinstance(branch, node_type)]
+    return list(index[node_type])
 
 
 def findTriShapeByName(mesh, data):
@@ -116,28 +148,31 @@ def findTriShapeByName(mesh, data):
     name = mesh.split('|')[-1]
 
     # Find tri shapes with the same name
-    for tri_shape in getNiNodes(data, NifFormat.NiTriShape):
+    for tri_shape in _iterNiNodes(data, NifFormat.NiTriShape):
         if name == tri_shape.name.decode():
             return tri_shape
 
     raise RuntimeError('Failed to find mesh in nif file with name "%s"' % name)
 
 
-def findTriShapesByPolygons(mesh, data):
+def findTriShapesByPolygons(mesh, data, tri_shapes=None, fnMesh=None):
     """
     Finds tri shapes in a nif scene with the same polycount as a mesh.
 
     Args:
         mesh(str): A list of meshes in the current scene.
         data(NifFormat.Data): Nif data.
+        tri_shapes(list[NifFormat.NiTriShape]): Optional tri shapes to search, defaults to all tri shapes in the data.
+        fnMesh(om2.MFnMesh): An optional function set already attached to the mesh.
 
     Returns:
         List[Tuple[NifFormat.NiTriShape, List[int]]]: Nif tri shapes and matching faces.
     """
     # Get vertex counts of each mesh
-    sel = om2.MSelectionList()
-    sel.add(mesh)
-    fnMesh = om2.MFnMesh(sel.getDependNode(0))
+    if fnMesh is None:
+        sel = om2.MSelectionList()
+        sel.add(mesh)
+        fnMesh = om2.MFnMesh(sel.getDependNode(0))
 
     # Find shaders for each polygon
     shaders, faces = fnMesh.getConnectedShaders(0)
@@ -146,12 +181,16 @@ def findTriShapesByPolygons(mesh, data):
         face_groups[shader].append(face)
 
     # Find tri shapes with the same counts
+    face_groups_by_count = {}
+    for faces in face_groups:
+        face_groups_by_count.setdefault(len(faces), faces)
+    if tri_shapes is None:
+        tri_shapes = getNiNodes(data, NifFormat.NiTriShape)
     tri_shape_faces = []
-    for tri_shape in getNiNodes(data, NifFormat.NiTriShape):
-        for faces in face_groups:
-            if len(faces) == tri_shape.data.num_triangles:
-                tri_shape_faces.append((tri_shape, faces))
-                break
+    for tri_shape in tri_shapes:
+        faces = face_groups_by_count.get(tri_shape.data.num_triangles)
+        if faces is not None:
+            tri_shape_faces.append((tri_shape, faces))
     return tri_shape_faces
 
 
@@ -166,7 +205,7 @@ def findNiNode(data, name):
     Returns:
         NiNode: A nif node.
     """
-    for node in getNiNodes(data, NifFormat.NiNode):
+    for node in _iterNiNodes(data, NifFormat.NiNode):
         if toMayaName(node.name.decode()) == name:
             return node
     return None
@@ -210,19 +249,19 @@ def setMeshTextures(data, mesh, albedo=None, normal=None, emissive=None, cubemap
             continue
         texture_set = property.texture_set
         if albedo is not None:
-            texture_set.textures[0] = albedo.replace('/', '\\').encode()
+            texture_set.textures[0] = albedo.encode().translate(NIF_PATH_TABLE)
         if normal is not None:
-            texture_set.textures[1] = normal.replace('/', '\\').encode()
+            texture_set.textures[1] = normal.encode().translate(NIF_PATH_TABLE)
         if emissive is not None:
-            texture_set.textures[2] = emissive.replace('/', '\\').encode()
+            texture_set.textures[2] = emissive.encode().translate(NIF_PATH_TABLE)
         if height is not None:
-            texture_set.textures[3] = height.replace('/', '\\').encode()
+            texture_set.textures[3] = height.encode().translate(NIF_PATH_TABLE)
         if cubemap is not None:
-            texture_set.textures[4] = cubemap.replace('/', '\\').encode()
+            texture_set.textures[4] = cubemap.encode().translate(NIF_PATH_TABLE)
         if metallic is not None:
-            texture_set.textures[5] = metallic.replace('/', '\\').encode()
+            texture_set.textures[5] = metallic.encode().translate(NIF_PATH_TABLE)
         if subsurface is not None:
-            texture_set.textures[7] = subsurface.replace('/', '\\').encode()
+            texture_set.textures[7] = subsurface.encode().translate(NIF_PATH_TABLE)
 
 
 
@@ -236,12 +275,21 @@ def fixNifMeshes(data, meshes):
         meshes(list[str]): A list of mesh names in the current scene.
     """
 
-    # Update texture paths)
-    for texture_set in getNiNodes(data, NifFormat.BSShaderTextureSet):
-        for i, texture in enumerate(texture_set.textures):
-            path = texture.decode()
-            path = path.replace('/', '\\')
-            texture_set.textures[i] = path.encode()
+    # Gather texture sets and tri shapes in a single pass
+    texture_sets = []
+    tri_shapes = []
+    for branch in data.get_global_iterator():
+        if isinstance(branch, NifFormat.NiTriShape):
+            tri_shapes.append(branch)
+        elif isinstance(branch, NifFormat.BSShaderTextureSet):
+            texture_sets.append(branch)
+
+    # Update texture paths, most are already using backslashes
+    for texture_set in texture_sets:
+        textures = texture_set.textures
+        for i, texture in enumerate(textures):
+            if b'/' in texture:
+                textures[i] = texture.translate(NIF_PATH_TABLE)
 
     # Iterate all meshes in the nif scene
     for mesh in meshes:
@@ -253,39 +301,38 @@ def fixNifMeshes(data, meshes):
         sel.add(mesh)
         fnMesh = om2.MFnMesh(sel.getDependNode(0))
 
+        # Get the vertices of every polygon in one query
+        polygon_counts, polygon_connects = fnMesh.getVertices()
+        polygon_connects = list(polygon_connects)
+        polygon_offsets = [0]
+        for count in polygon_counts:
+            polygon_offsets.append(polygon_offsets[-1] + count)
+
+        # Get the meshes back face culling
+        double_sided = cmds.getAttr('%s.doubleSided' % mesh)
+
         # Mesh data
-        tri_shape_faces = findTriShapesByPolygons(mesh, data)
+        tri_shape_faces = findTriShapesByPolygons(mesh, data, tri_shapes, fnMesh)
         for tri_shape, faces in tri_shape_faces:
             shape_data = tri_shape.data
-            face_weights = {index: weights for index, weights in maya_weights.items() if index in faces}
+            face_set = set(faces)
+            face_weights = {index: weights for index, weights in maya_weights.items() if index in face_set}
 
             # Update mesh name
             tri_shape.name = meshName.encode()
 
             # Map maya vertices to nif vertices
-            verts_per_polygon, normal_ids_per_polygon_index = fnMesh.getNormalIds()
-            mesh_normals = fnMesh.getNormals()
-            mesh_tangents = fnMesh.getTangents()
-            mesh_binormals = fnMesh.getBinormals()
             nif_to_maya_vertex_mapping = {}
-            maya_to_nif_vertex_mapping = {}
-            nif_vertex_data = {}
-            for i in range(fnMesh.numPolygons):
-                if i not in faces:
-                    continue
-                for maya_vertex, nif_vertex in zip(fnMesh.getPolygonVertices(i), getTriangleVertices(shape_data.triangles[i])):
+            maya_to_nif_vertex_mapping = defaultdict(set)
+            nif_triangles = shape_data.get_triangles()
+            for i in faces:
+                polygon_vertices = polygon_connects[polygon_offsets[i]:polygon_offsets[i + 1]]
+                for maya_vertex, nif_vertex in zip(polygon_vertices, nif_triangles[i]):
                     nif_to_maya_vertex_mapping[nif_vertex] = maya_vertex
-                    maya_to_nif_vertex_mapping.setdefault(maya_vertex, set())
                     maya_to_nif_vertex_mapping[maya_vertex].add(nif_vertex)
 
-                    # Get the meshes vertex normals, tangents and binormals
-                    normal = mesh_normals[normal_ids_per_polygon_index[i]]
-                    tangent = mesh_tangents[normal_ids_per_polygon_index[i]]
-                    binormal = mesh_binormals[normal_ids_per_polygon_index[i]]
-                    nif_vertex_data[nif_vertex] = (normal, tangent, binormal)
-
             # Apply vertex data
-            for vertex, (normal, tangent, binormal) in nif_vertex_data.items():
+            for vertex in nif_to_maya_vertex_mapping:
                 x = tri_shape.data.normals[vertex].x
                 y = tri_shape.data.normals[vertex].y
                 z = tri_shape.data.normals[vertex].z
@@ -295,7 +342,7 @@ def fixNifMeshes(data, meshes):
             tri_shape.update_tangent_space()
 
             # Apply back facing culling
-            if cmds.getAttr('%s.doubleSided' % mesh):
+            if double_sided:
                 tri_shape.bs_properties[0].shader_flags_2.slsf_2_double_sided = 1
 
             # Add alpha property
@@ -312,25 +359,19 @@ def fixNifMeshes(data, meshes):
             skin_partition = skin_instance.skin_partition
 
             # Get the skins bone indices
-            bone_names = {}
-            bone_indices = {}
-            for index, bone in enumerate(skin_instance.bones):
-                bone_names[index] = toMayaName(bone.name.decode())
-                bone_indices[toMayaName(bone.name.decode())] = index
+            maya_bone_names = [toMayaName(bone.name.decode()) for bone in skin_instance.bones]
+            bone_indices = {name: index for index, name in enumerate(maya_bone_names)}
 
             # Convert maya weights into nif weights
-            nif_weights = {}
+            nif_weights = [None] * shape_data.num_vertices
             for maya_index, maya_bone_weights in face_weights.items():
-                for nif_index in maya_to_nif_vertex_mapping[maya_index]:
-                    maya_bone_weights = {bone: weight for bone, weight in maya_bone_weights.items() if weight > 0.001}
-                    nif_weights[nif_index] = {bone_indices[bone]: weight for bone, weight in maya_bone_weights.items()}
-
-            # Map maya bones to nif bones
-            nif_bone_to_maya_bone = {}
-            for nif_bone in skin_instance.bones:
-                maya_bone = toMayaName(nif_bone.name.decode())
-                nif_bone_to_maya_bone[nif_bone] = maya_bone
-                maya_to_nif_vertex_mapping[maya_bone] = nif_bone
+                nif_indices = maya_to_nif_vertex_mapping[maya_index]
+                if not nif_indices:
+                    continue
+                vertex_weights = tuple((bone_indices[bone], weight) for bone, weight in maya_bone_weights.items()
+                                       if weight > 0.001)
+                for nif_index in nif_indices:
+                    nif_weights[nif_index] = vertex_weights
 
             # Update skinning for each partition
             for skin_partition_block in skin_partition.skin_partition_blocks:
@@ -350,29 +391,43 @@ def fixNifMeshes(data, meshes):
                 # Get a mapping of skin partition bone indices to skin instance bone indices
                 partition_bone_indices = {index: i for i, index in enumerate(skin_partition_block.bones)}
 
-                # print (len(skin_partition_block.bone_indices), len(skin_partition_block.vertex_map))
-                for partition_vertex, vertex in enumerate(skin_partition_block.vertex_map):
-                    # Clear existing bone weights
-                    for i in range(4):
-                        skin_partition_block.bone_indices[partition_vertex][i] = skin_partition_block.bones[0]
-                        skin_partition_block.vertex_weights[partition_vertex][i] = 0.0
-
-                    # Set bone weights
-                    vertex_bone_weights = {index: weight for index, weight in nif_weights[vertex].items() if weight > 0.001}
-                    for i, (bone_index, weight) in enumerate(vertex_bone_weights.items()):
-                        try:
-                            skin_partition_block.bone_indices[partition_vertex]
-                        except KeyError:
-                            raise KeyError(f'Failed to find partition vertex {partition_vertex} for mesh {meshName}')
-                        try:
-                            skin_partition_block.bone_indices[partition_vertex][i]
-                        except KeyError:
-                            raise KeyError(f'Failed to find bone index {i} for partition vertex {partition_vertex} of '
-                                           f'mesh {meshName}')
-                        try:
-                            partition_bone_indices[bone_index]
-                        except KeyError:
-                            raise KeyError(f'Failed to find bone index {bone_index} for mesh {meshName}')
-                        skin_partition_block.bone_indices[partition_vertex][i] = partition_bone_indices[bone_index]
-                        skin_partition_block.vertex_weights[partition_vertex][i] = weight
+                # Set the weights of each partition vertex
+                _setPartitionWeights(skin_partition_block, nif_weights, partition_bone_indices, meshName)
+
 
+def _setPartitionWeights(skin_partition_block, nif_weights, partition_bone_indices, meshName):
+    """
+    Sets the bone indices and weights of each vertex in a skin partition.
+    Unused influence slots are reset to the first bone with a weight of 0.
+
+    Args:
+        skin_partition_block(NifFormat.SkinPartition): A skin partition block.
+        nif_weights(list[tuple]): Skin instance bone index and weight pairs for each nif vertex.
+        partition_bone_indices(dict): A mapping of skin instance bone indices to partition bone indices.
+        meshName(str): The name of the mesh being updated.
+    """
+    bone_indices = skin_partition_block.bone_indices
+    vertex_weights = skin_partition_block.vertex_weights
+    num_partition_vertices = len(bone_indices)
+    if num_partition_vertices < len(skin_partition_block.vertex_map):
+        raise KeyError(f'Failed to find partition vertex {num_partition_vertices} for mesh {meshName}')
+
+    default_bone = skin_partition_block.bones[0]
+    for partition_vertex, vertex in enumerate(skin_partition_block.vertex_map):
+        vertex_bone_indices = bone_indices[partition_vertex]
+        vertex_bone_weights = vertex_weights[partition_vertex]
+
+        # Set bone weights
+        weights = nif_weights[vertex]
+        if weights is None:
+            raise KeyError(f'Failed to find weights for vertex {vertex} of mesh {meshName}')
+        if len(weights) > 4:
+            raise KeyError(f'Failed to find bone index 4 for partition vertex {partition_vertex} of mesh {meshName}')
+        for i, (bone_index, weight) in enumerate(weights):
+            vertex_bone_indices[i] = partition_bone_indices[bone_index]
+            vertex_bone_weights[i] = weight
+
+        # Clear unused bone weights
+        for i in range(len(weights), 4):
+            vertex_bone_indices[i] = default_bone
+            vertex_bone_weights[i] = 0.0
@@ -1,5 +1,6 @@
 """ Library for creating CK physics objects. """
 
+import functools
 import math
 import enum
 from maya import cmds
@@ -14,6 +15,61 @@ CAPSULE_END_ID = 0
 CAPSULE_Z_UP_ID = 19
 CAPSULE_Z_DOWN_ID = 22
 
+# Capsule vertices in radius units, the first column marks vertices offset by the radius and height
+CAPSULE_UNIT_POINTS = (
+    (1, 1.0, 0.0, 0.0),
+    (1, 0.868, 0.0, 0.5),
+    (1, 0.868, -0.433, 0.25),
+    (1, 0.868, -0.433, -0.25),
+    (1, 0.868, 0.0, -0.5),
+    (1, 0.868, 0.433, -0.25),
+    (1, 0.868, 0.433, 0.25),
+    (1, 0.5, 0.0, 0.866),
+    (1, 0.5, -0.75, 0.433),
+    (1, 0.5, -0.75, -0.433),
+    (1, 0.5, 0.0, -0.866),
+    (1, 0.5, 0.75, -0.433),
+    (1, 0.5, 0.75, 0.433),
+    (1, 0.0, 0.0, 1.0),
+    (1, 0.0, -0.866, 0.5),
+    (1, 0.0, -0.866, -0.5),
+    (1, 0.0, 0.0, -1.0),
+    (1, 0.0, 0.866, -0.5),
+    (1, 0.0, 0.866, 0.5),
+    (0, 1.0, 0.0, 1.0),
+    (0, 1.0, -0.866, 0.5),
+    (0, 1.0, -0.866, -0.5),
+    (0, 1.0, 0.0, -1.0),
+    (0, 1.0, 0.866, -0.5),
+    (0, 1.0, 0.866, 0.5),
+    (0, 0.5, 0.0, 0.866),
+    (0, 0.5, -0.75, 0.433),
+    (0, 0.5, -0.75, -0.433),
+    (0, 0.5, 0.0, -0.866),
+    (0, 0.5, 0.75, -0.433),
+    (0, 0.5, 0.75, 0.433),
+    (0, 0.132, 0.0, 0.5),
+    (0, 0.132, -0.433, 0.25),
+    (0, 0.132, -0.433, -0.25),
+    (0, 0.132, 0.0, -0.5),
+    (0, 0.132, 0.433, -0.25),
+    (0, 0.132, 0.433, 0.25),
+    (0, 0.0, 0.0, 0.0),
+)
+
+# The number of vertices in each capsule triangle and the vertex indices that make each triangle
+CAPSULE_POLYGON_COUNTS = (3,) * 72
+CAPSULE_POLYGON_CONNECTS = (
+    0, 1, 2, 0, 2, 3, 0, 3, 4, 0, 4, 5, 0, 5, 6, 0, 6, 1, 1, 7, 8, 2, 1, 8, 2, 8, 9, 3, 2, 9, 3, 9, 10, 4, 3, 10,
+    4, 10, 11, 5, 4, 11, 5, 11, 12, 6, 5, 12, 6, 12, 7, 1, 6, 7, 7, 13, 14, 8, 7, 14, 8, 14, 15, 9, 8, 15, 9, 15,
+    16, 10, 9, 16, 10, 16, 17, 11, 10, 17, 11, 17, 18, 12, 11, 18, 12, 18, 13, 7, 12, 13, 13, 19, 20, 14, 13, 20,
+    14, 20, 21, 15, 14, 21, 15, 21, 22, 16, 15, 22, 16, 22, 23, 17, 16, 23, 17, 23, 24, 18, 17, 24, 18, 24, 19, 13,
+    18, 19, 19, 25, 26, 20, 19, 26, 20, 26, 27, 21, 20, 27, 21, 27, 28, 22, 21, 28, 22, 28, 29, 23, 22, 29, 23, 29,
+    30, 24, 23, 30, 24, 30, 25, 19, 24, 25, 25, 31, 32, 26, 25, 32, 26, 32, 33, 27, 26, 33, 27, 33, 34, 28, 27, 34,
+    28, 34, 35, 29, 28, 35, 29, 35, 36, 30, 29, 36, 30, 36, 31, 25, 30, 31, 32, 31, 37, 33, 32, 37, 34, 33, 37, 35,
+    34, 37, 36, 35, 37, 31, 36, 37,
+)
+
 
 def updateBoundingBox(box, mesh):
     """
@@ -29,40 +85,35 @@ def updateBoundingBox(box, mesh):
         """ Centers a mesh without modifying the pivot. """
         parent = cmds.listRelatives(box, parent=True, fullPath=True)[0]
 
-        center = om2.MVector()
-        vertices = cmds.ls('%s.vtx[*]' % box, fl=True)
-        for vert in vertices:
-            center += om2.MVector(cmds.xform(vert, q=True, t=True, ws=True))
-        center /= float(len(vertices))
+        points = getMeshPoints(box)
+        center = sum(points, om2.MVector()) / float(len(points))
         position = om2.MVector(cmds.xform(parent, t=True, q=True, ws=True))
         cmds.xform(parent, t=list(center), ws=True)
+
+        # Move the vertices back to their original world positions
         offset = position - center
-        for vert in vertices:
-            vertPoint = om2.MVector(cmds.xform(vert, t=True, q=True, ws=True))
-            cmds.xform(vert, t=list(vertPoint + offset), ws=True)
+        cmds.move(offset.x, offset.y, offset.z, '%s.vtx[*]' % box, relative=True, worldSpace=True)
 
     def getBoxVerts(box):
         """ Gets the bounding verts of a bounding box mesh. """
-        vertices = cmds.ls('%s.vtx[*]' % box, fl=True)
-        boxPoints = [(vert, [1 if axis > 0 else -1 for axis in cmds.xform(vert, t=True, os=True, q=True)])
-                     for vert in vertices]
-        verts = []
-        for xSign in [-1, 1]:
-            for ySign in [-1, 1]:
-                for zSign in [-1, 1]:
-                    for vert, point in boxPoints:
-                        if point == [xSign, ySign, zSign]:
-                            verts.append(vert)
-                            break
-        return verts
+        # Store the first vertex in each octant, ordered by x, y then z sign
+        octants = [None] * 8
+        remaining = 8
+        for i, point in enumerate(getMeshPoints(box, om2.MSpace.kObject)):
+            octant = (point[0] > 0) << 2 | (point[1] > 0) << 1 | (point[2] > 0)
+            if octants[octant] is None:
+                octants[octant] = '%s.vtx[%s]' % (box, i)
+                remaining -= 1
+                if remaining == 0:
+                    break
+        return [vert for vert in octants if vert is not None]
 
     def flattenBottom(box):
         """ Ensures the given box does not extend below world 0. """
-        vertices = cmds.ls('%s.vtx[*]' % box, fl=True)
-        for vert in vertices:
-            point = cmds.xform(vert, t=True, ws=True, q=True)
-            point[1] = max(point[1], 0.0)
-            cmds.xform(vert, t=point, ws=True)
+        for i, point in enumerate(getMeshPoints(box)):
+            if point[1] < 0.0:
+                point[1] = 0.0
+                cmds.xform('%s.vtx[%s]' % (box, i), t=list(point), ws=True)
 
     mesh = cmds.geomToBBox(mesh, ko=True)[0]
     mesh = cmds.listRelatives(mesh, type='mesh', fullPath=True)[0]
@@ -91,33 +142,40 @@ def addRigidBody(joint):
     childJoints = [child for child in cmds.listRelatives(joint, type='joint', fullPath=True) or []
                    if not child.endswith('_rb')]
 
+    # Get the joint world matrix and radius
+    sel = om2.MSelectionList()
+    sel.add(joint)
+    jointPath = sel.getDagPath(0)
+    jointMatrix = jointPath.inclusiveMatrix()
+    jointRadius = om2.MFnDependencyNode(jointPath.node()).findPlug('radius', False).asDouble()
+
     # Get joint positions
-    jointRadius = cmds.getAttr('%s.radius' % joint)
-    jointPosition = om2.MVector(cmds.xform(joint, t=True, ws=True, q=True))
-    childPositions = [om2.MVector(cmds.xform(child, t=True, ws=True, q=True)) for child in childJoints]
+    jointPosition = om2.MVector(jointMatrix[12], jointMatrix[13], jointMatrix[14])
+    childDistances = [(om2.MVector(cmds.xform(child, t=True, ws=True, q=True)) - jointPosition).length()
+                      for child in childJoints]
 
     # Default height and radius is based on joint radius
     height, radius = 0.0, jointRadius
-    if len(childJoints) == 1:
+    if len(childDistances) == 1:
         # If there is only one child determine the dimensions based on the distance
-        childDistance = (childPositions[0] - jointPosition).length()
+        childDistance = childDistances[0]
         if childDistance > 0.01:
             radius = childDistance / 3.0
             height = max(0, childDistance - (radius * 2.0))
 
-    elif len(childJoints) > 1:
+    elif len(childDistances) > 1:
         # If there are multiple children, determine based on longest child distance
-        childDistances = [(childPosition - jointPosition).length() for childPosition in childPositions]
-        if max(childDistances) > 0.01:
+        maxDistance = max(childDistances)
+        if maxDistance > 0.01:
             radius = sum(childDistances) / float(len(childDistances))
-            height = max(childDistances) / 2.0 - (radius * 2.0)
+            height = maxDistance / 2.0 - (radius * 2.0)
 
     jointName = joint.split('|')[-1]
     rbJoint = createRigidBody(jointName, radius=radius, height=height)
-    cmds.setAttr('%s.radius' % rbJoint, cmds.getAttr('%s.radius' % joint) / 2.0)
+    cmds.setAttr('%s.radius' % rbJoint, jointRadius / 2.0)
 
     # Match joint transformation
-    cmds.xform(rbJoint, m=cmds.xform(joint, q=True, m=True, ws=True), ws=True)
+    cmds.xform(rbJoint, m=list(jointMatrix), ws=True)
 
     return rbJoint
 
@@ -148,12 +206,7 @@ def getSceneRigidbodies():
     Returns:
         list[str]: A list of joint names.
     """
-    rigidbodies = []
-    for node in cmds.ls(type='joint'):
-        rb = getRigidBody(node)
-        if rb is not None:
-            rigidbodies.append(rb)
-    return rigidbodies
+    return cmds.ls('*_rb', type='joint', recursive=True) or []
 
 
 def getSelectedRigidBody():
@@ -180,6 +233,11 @@ def getCapsule(rigidbody):
     Returns:
         str: A capsule mesh name.
     """
+    # Capsules are named after their rigidbody, so check for that name first
+    capsules = cmds.ls('%s|%s_capsule' % (rigidbody, rigidbody.split('|')[-1]), long=True) or []
+    if len(capsules) == 1:
+        return capsules[0]
+
     for child in cmds.listRelatives(rigidbody, fullPath=True) or []:
         if child.endswith('_rb_capsule'):
             return child
@@ -203,6 +261,7 @@ def toCkName(name):
     return name
 
 
+@functools.lru_cache(maxsize=1024)
 def getAttachmentSource(attachment):
     """
     Gets the source rigidbody of an attachment.
@@ -216,6 +275,7 @@ def getAttachmentSource(attachment):
     return attachment.split('_con_')[0]
 
 
+@functools.lru_cache(maxsize=1024)
 def getAttachmentDestination(attachment):
     """
     Gets the destination rigidbody of an attachment.
@@ -272,18 +332,85 @@ def getAttachments(rigidbody):
     return attachments
 
 
-def getMeshPoints(mesh):
+def _getMeshFn(mesh):
+    """
+    Gets a mesh function set for a mesh or its transform.
+
+    Args:
+        mesh(str): A mesh or transform name.
+
+    Returns:
+        MFnMesh: A mesh function set.
+    """
+    sel = om2.MSelectionList()
+    sel.add(mesh)
+    dagPath = sel.getDagPath(0)
+    if dagPath.apiType() != om2.MFn.kMesh:
+        dagPath.extendToShape()
+    return om2.MFnMesh(dagPath)
+
+
+def getMeshPoints(mesh, space=om2.MSpace.kWorld):
     """
     Gets a list of vertex positions on a mesh.
 
     Args:
         mesh(str): A mesh name.
+        space(int): The MSpace constant to get positions in.
 
     Returns:
         list: A list of MVector points.
     """
-    vertices = cmds.ls('%s.vtx[*]' % mesh, fl=True)
-    return [om2.MVector(cmds.xform(v, t=True, ws=True, q=True)) for v in vertices]
+    return [om2.MVector(point) for point in _getMeshFn(mesh).getPoints(space)]
+
+
+def _setMeshPoints(mesh, points):
+    """
+    Sets the world space vertex positions of a mesh as a single undo step.
+
+    Args:
+        mesh(str): A mesh name.
+        points(list): A list of positions for each vertex.
+    """
+    try:
+        cmds.undoInfo(openChunk=True)
+        for i, point in enumerate(points):
+            cmds.xform('%s.vtx[%s]' % (mesh, i), t=list(point), ws=True)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+
+def _getCapsuleKeyPoints(mesh, space=om2.MSpace.kWorld):
+    """
+    Gets only the vertex positions used to measure a capsule.
+
+    Args:
+        mesh(str): A mesh name.
+        space(int): The MSpace constant to get positions in.
+
+    Returns:
+        dict: A mapping of vertex indices to MVector points.
+    """
+    fnMesh = _getMeshFn(mesh)
+    return {
+        i: om2.MVector(fnMesh.getPoint(i, space))
+        for i in (CAPSULE_START_ID, CAPSULE_END_ID, CAPSULE_Z_UP_ID, CAPSULE_Z_DOWN_ID)
+    }
+
+
+def _getCapsuleSize(points):
+    """
+    Gets the height and radius of a capsule from its vertex positions.
+
+    Args:
+        points(list|dict): Vertex positions indexable by vertex id.
+
+    Returns:
+        float, float: The height and radius.
+    """
+    radius = (points[CAPSULE_Z_UP_ID] - points[CAPSULE_Z_DOWN_ID]).length() / 2.0
+    height = (points[CAPSULE_END_ID] - points[CAPSULE_START_ID]).length() - (radius * 2.0)
+    return height, radius
 
 
 def getCapsuleHeight(capsule):
@@ -296,9 +423,8 @@ def getCapsuleHeight(capsule):
     Returns:
         float: The height.
     """
-    capsule = getCapsule(capsule)
-    points = getMeshPoints(capsule)
-    return (points[CAPSULE_END_ID] - points[CAPSULE_START_ID]).length() - (getCapsuleRadius(capsule) * 2.0)
+    height, radius = _getCapsuleSize(_getCapsuleKeyPoints(getCapsule(capsule)))
+    return height
 
 
 def getCapsuleRadius(capsule):
@@ -311,9 +437,8 @@ def getCapsuleRadius(capsule):
     Returns:
         float: The radius.
     """
-    capsule = getCapsule(capsule)
-    points = getMeshPoints(capsule)
-    return (points[CAPSULE_Z_UP_ID] - points[CAPSULE_Z_DOWN_ID]).length() / 2.0
+    height, radius = _getCapsuleSize(_getCapsuleKeyPoints(getCapsule(capsule)))
+    return radius
 
 
 def capsulePoints(height=1.0, radius=1.0):
@@ -327,47 +452,8 @@ def capsulePoints(height=1.0, radius=1.0):
     Returns:
         list: A list of points.
     """
-
-    return [
-        [radius + height + radius, 0.0, 0.0],
-        [radius + height + (0.868 * radius), 0.0 * radius, 0.5 * radius],
-        [radius + height + (0.868 * radius), -0.433 * radius, 0.25 * radius],
-        [radius + height + (0.868 * radius), -0.433 * radius, -0.25 * radius],
-        [radius + height + (0.868 * radius), 0.0 * radius, -0.5 * radius],
-        [radius + height + (0.868 * radius), 0.433 * radius, -0.25 * radius],
-        [radius + height + (0.868 * radius), 0.433 * radius, 0.25 * radius],
-        [radius + height + (0.5 * radius), 0.0 * radius, 0.866 * radius],
-        [radius + height + (0.5 * radius), -0.75 * radius, 0.433 * radius],
-        [radius + height + (0.5 * radius), -0.75 * radius, -0.433 * radius],
-        [radius + height + (0.5 * radius), 0.0 * radius, -0.866 * radius],
-        [radius + height + (0.5 * radius), 0.75 * radius, -0.433 * radius],
-        [radius + height + (0.5 * radius), 0.75 * radius, 0.433 * radius],
-        [radius + height, 0.0 * radius, 1.0 * radius],
-        [radius + height, -0.866 * radius, 0.5 * radius],
-        [radius + height, -0.866 * radius, -0.5 * radius],
-        [radius + height, 0.0 * radius, -1.0 * radius],
-        [radius + height, 0.866 * radius, -0.5 * radius],
-        [radius + height, 0.866 * radius, 0.5 * radius],
-        [1.0 * radius, 0.0 * radius, 1.0 * radius],
-        [1.0 * radius, -0.866 * radius, 0.5 * radius],
-        [1.0 * radius, -0.866 * radius, -0.5 * radius],
-        [1.0 * radius, 0.0 * radius, -1.0 * radius],
-        [1.0 * radius, 0.866 * radius, -0.5 * radius],
-        [1.0 * radius, 0.866 * radius, 0.5 * radius],
-        [0.5 * radius, 0.0 * radius, 0.866 * radius],
-        [0.5 * radius, -0.75 * radius, 0.433 * radius],
-        [0.5 * radius, -0.75 * radius, -0.433 * radius],
-        [0.5 * radius, 0.0 * radius, -0.866 * radius],
-        [0.5 * radius, 0.75 * radius, -0.433 * radius],
-        [0.5 * radius, 0.75 * radius, 0.433 * radius],
-        [0.132 * radius, 0.0 * radius, 0.5 * radius],
-        [0.132 * radius, -0.433 * radius, 0.25 * radius],
-        [0.132 * radius, -0.433 * radius, -0.25 * radius],
-        [0.132 * radius, 0.0 * radius, -0.5 * radius],
-        [0.132 * radius, 0.433 * radius, -0.25 * radius],
-        [0.132 * radius, 0.433 * radius, 0.25 * radius],
-        [0.0, 0.0, 0.0]
-    ]
+    offset = radius + height
+    return [[offset * extend + x * radius, y * radius, z * radius] for extend, x, y, z in CAPSULE_UNIT_POINTS]
 
 
 def createCapsule(name, height=2.0, radius=1.0, parent=None):
@@ -393,31 +479,11 @@ def createCapsule(name, height=2.0, radius=1.0, parent=None):
     parentObj = sel.getDependNode(0)
 
     # list of vertex points
-    vertices = [om2.MVector(point) for point in capsulePoints(height=height, radius=radius)]
-
-    # Apply pivot
-    vertices = [om2.MPoint(point) for point in vertices]
-
-    # list of number of vertices per polygon
-    # A cube has 6 faces of 4 vertices each
-    polygonFaces = [3] * 72
-
-    # list of vertex indices that make the
-    # the polygons in our mesh
-    polygonConnects = [
-         0, 1, 2, 0, 2, 3, 0, 3, 4, 0, 4, 5, 0, 5, 6, 0, 6, 1, 1, 7, 8, 2, 1, 8, 2, 8, 9, 3, 2, 9, 3, 9, 10, 4, 3, 10,
-         4, 10, 11, 5, 4, 11, 5, 11, 12, 6, 5, 12, 6, 12, 7, 1, 6, 7, 7, 13, 14, 8, 7, 14, 8, 14, 15, 9, 8, 15, 9, 15,
-         16, 10, 9, 16, 10, 16, 17, 11, 10, 17, 11, 17, 18, 12, 11, 18, 12, 18, 13, 7, 12, 13, 13, 19, 20, 14, 13, 20,
-         14, 20, 21, 15, 14, 21, 15, 21, 22, 16, 15, 22, 16, 22, 23, 17, 16, 23, 17, 23, 24, 18, 17, 24, 18, 24, 19, 13,
-         18, 19, 19, 25, 26, 20, 19, 26, 20, 26, 27, 21, 20, 27, 21, 27, 28, 22, 21, 28, 22, 28, 29, 23, 22, 29, 23, 29,
-         30, 24, 23, 30, 24, 30, 25, 19, 24, 25, 25, 31, 32, 26, 25, 32, 26, 32, 33, 27, 26, 33, 27, 33, 34, 28, 27, 34,
-         28, 34, 35, 29, 28, 35, 29, 35, 36, 30, 29, 36, 30, 36, 31, 25, 30, 31, 32, 31, 37, 33, 32, 37, 34, 33, 37, 35,
-         34, 37, 36, 35, 37, 31, 36, 37
-    ]
+    vertices = [om2.MPoint(point) for point in capsulePoints(height=height, radius=radius)]
 
     # create the mesh
     meshFn = om2.MFnMesh()
-    meshFn.create(vertices, polygonFaces, polygonConnects, parent=parentObj)
+    meshFn.create(vertices, CAPSULE_POLYGON_COUNTS, CAPSULE_POLYGON_CONNECTS, parent=parentObj)
 
     return parentName
 
@@ -501,9 +567,15 @@ def assignPhysicsMaterial(mesh):
     if material is None:
         material = createPhysicsMaterial()
 
+    # Get the materials shading group, creating one if it does not exist
+    shadingGroups = cmds.listConnections(f'{material}.outColor', type='shadingEngine') or []
+    if len(shadingGroups) > 0:
+        shadingGroup = shadingGroups[0]
+    else:
+        shadingGroup = cmds.sets(empty=True, renderable=True, noSurfaceShader=True, name=f"{material}_sg")
+        cmds.connectAttr(f'{material}.outColor', f'{shadingGroup}.surfaceShader', f=True)
+
     # Assign the material
-    shadingGroup = cmds.sets(empty=True, renderable=True, noSurfaceShader=True, name=f"{material}_sg")
-    cmds.connectAttr(f'{material}.outColor', f'{shadingGroup}.surfaceShader', f=True)
     cmds.sets(mesh, e=True, forceElement=shadingGroup)
 
 
@@ -517,13 +589,11 @@ def getCapsuleMatrix(points):
     Returns:
         MMatrix: A capsule matrix.
     """
-    points = [om2.MVector(point) for point in points]
-
-    xVector = (points[CAPSULE_END_ID] - points[CAPSULE_START_ID]).normal()
-    upVector = (points[CAPSULE_Z_UP_ID] - points[CAPSULE_START_ID]).normal()
+    origin = om2.MVector(points[CAPSULE_START_ID])
+    xVector = (om2.MVector(points[CAPSULE_END_ID]) - origin).normal()
+    upVector = (om2.MVector(points[CAPSULE_Z_UP_ID]) - origin).normal()
     yVector = (xVector ^ upVector).normal()
     zVector = (xVector ^ yVector).normal()
-    origin = points[CAPSULE_START_ID]
     capsuleMatrix = om2.MMatrix([
         [xVector[0], xVector[1], xVector[2], 0.0],
         [yVector[0], yVector[1], yVector[2], 0.0],
@@ -543,8 +613,7 @@ def getCapsulePivot(points):
     Returns:
         MVector: A pivot point.
     """
-    points = [om2.MVector(point) for point in points]
-    return points[CAPSULE_START_ID]
+    return om2.MVector(points[CAPSULE_START_ID])
 
 
 def _composeMatrix(translate=None, rotate=None, scale=None):
@@ -599,34 +668,29 @@ def updateCapsule(mesh, radius=None, height=None):
         mesh = cmds.listRelatives(mesh, type='mesh', fullPath=True)[0]
 
     # Get the mesh vertex positions
-    vertices = cmds.ls('%s.vtx[*]' % mesh, fl=True)
-    vertexPoints = [om2.MVector(cmds.xform(v, t=True, ws=True, q=True)) for v in vertices]
+    vertexPoints = getMeshPoints(mesh)
 
     # Get the local capsule matrix
     capsuleMatrix = getCapsuleMatrix(vertexPoints)
 
     # Determine the height and radius if not set
+    currentHeight, currentRadius = _getCapsuleSize(vertexPoints)
     if height is not None and radius is None:
-        radius = getCapsuleRadius(mesh) - ((height - getCapsuleHeight(mesh)) / 2.0)
+        radius = currentRadius - ((height - currentHeight) / 2.0)
     elif height is None and radius is not None:
-        height = max(0.0, getCapsuleHeight(mesh) - ((radius - getCapsuleRadius(mesh)) * 2.0))
+        height = max(0.0, currentHeight - ((radius - currentRadius) * 2.0))
     elif height is None and radius is None:
-        radius = getCapsuleRadius(mesh)
-        height = getCapsuleHeight(mesh)
+        radius = currentRadius
+        height = currentHeight
 
     # Generate new vertex positions
     newVertexPoints = capsulePoints(height, radius)
 
     # Convert positions from capsule space to object space
-    newVertexPoints = [_decomposeMatrix(_composeMatrix(point) * capsuleMatrix) for point in newVertexPoints]
+    newVertexPoints = [om2.MVector(om2.MPoint(point) * capsuleMatrix) for point in newVertexPoints]
 
     # Update vertex positions
-    try:
-        cmds.undoInfo(openChunk=True)
-        for vertex, point in zip(vertices, newVertexPoints):
-            cmds.xform(vertex, t=point, ws=True)
-    finally:
-        cmds.undoInfo(closeChunk=True)
+    _setMeshPoints(mesh, newVertexPoints)
 
 
 def transformCapsule(mesh, translate=(0,0,0), rotate=(0,0,0), scale=(1,1,1), space=om2.MSpace.kWorld):
@@ -648,11 +712,22 @@ def transformCapsule(mesh, translate=(0,0,0), rotate=(0,0,0), scale=(1,1,1), spa
     # Get the mesh node
     if not cmds.nodeType(mesh) == 'mesh':
         mesh = cmds.listRelatives(mesh, type='mesh', fullPath=True)[0]
+    _transformCapsulePoints(mesh, getMeshPoints(mesh), translate, rotate, scale, space)
 
-    # Get the mesh vertex positions
-    vertices = cmds.ls('%s.vtx[*]' % mesh, fl=True)
-    vertexPoints = [om2.MVector(cmds.xform(v, t=True, ws=True, q=True)) for v in vertices]
 
+def _transformCapsulePoints(mesh, vertexPoints, translate=(0,0,0), rotate=(0,0,0), scale=(1,1,1),
+                            space=om2.MSpace.kWorld):
+    """
+    Applies a transformation to a capsule mesh given its current world space vertex positions.
+
+    Args:
+        mesh(str): A capsule mesh name.
+        vertexPoints(list): The current world space vertex positions of the mesh.
+        translate(list): The translation.
+        rotate(list): The rotation.
+        scale(list): The scale.
+        space(int): The MSpace constant to apply the transformation.
+    """
     # Get the capsule matrix
     capsuleMatrix = om2.MMatrix.kIdentity
     if space == om2.MSpace.kObject:
@@ -661,22 +736,14 @@ def transformCapsule(mesh, translate=(0,0,0), rotate=(0,0,0), scale=(1,1,1), spa
     elif space == om2.MSpace.kTransform:
         capsuleMatrix = getCapsuleMatrix(vertexPoints)
 
-    # Convert vertex positions into local space
-    vertexMatrices = [_composeMatrix(point) * capsuleMatrix.inverse() for point in vertexPoints]
-
-    # Generate the transformation matrix
-    matrix = _composeMatrix(translate, rotate, scale)
+    # Generate the transformation matrix, applied in local space
+    matrix = capsuleMatrix.inverse() * _composeMatrix(translate, rotate, scale) * capsuleMatrix
 
     # Apply transformation to points
-    newVertexPoints = [_decomposeMatrix(pointMatrix * matrix * capsuleMatrix) for pointMatrix in vertexMatrices]
+    newVertexPoints = [om2.MVector(om2.MPoint(point) * matrix) for point in vertexPoints]
 
     # Update vertex positions
-    try:
-        cmds.undoInfo(openChunk=True)
-        for vertex, point in zip(vertices, newVertexPoints):
-            cmds.xform(vertex, t=point, ws=True)
-    finally:
-        cmds.undoInfo(closeChunk=True)
+    _setMeshPoints(mesh, newVertexPoints)
 
 
 def aimCapsule(mesh, target):
@@ -694,7 +761,7 @@ def aimCapsule(mesh, target):
     # Get the target vector
     if not isinstance(target, (om2.MVector, tuple, list)):
         target = cmds.xform(target, t=True, ws=True, q=True)
-    targetMatrix = _composeMatrix(om2.MVector(target))
+    targetPoint = om2.MPoint(target)
 
     # Get the mesh vertex positions
     points = getMeshPoints(mesh)
@@ -702,9 +769,8 @@ def aimCapsule(mesh, target):
     # Get the capsule matrix
     capsuleMatrix = getCapsuleMatrix(points)
 
-    # Convert the target matrix into capsule space
-    targetMatrix = targetMatrix * capsuleMatrix.inverse()
-    targetPoint = _decomposeMatrix(targetMatrix)
+    # Convert the target point into capsule space
+    targetPoint = om2.MVector(targetPoint * capsuleMatrix.inverse())
 
     startVector = om2.MVector(1,0,0)
     endVector = targetPoint.normal()
@@ -712,6 +778,6 @@ def aimCapsule(mesh, target):
     rotation = rotation.asEulerRotation()
 
     # Rotate the capsule towards the target
-    transformCapsule(mesh, rotate=rotation, space=om2.MSpace.kObject)
+    _transformCapsulePoints(mesh, points, rotate=rotation, space=om2.MSpace.kObject)
 
 
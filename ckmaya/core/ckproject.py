@@ -1,6 +1,8 @@
 """ Core utilities for reading the Skywind project structure. """
 
 import os
+import copy
+import functools
 import json
 import tempfile
 import enum
@@ -9,6 +11,7 @@ from maya import OpenMaya as om
 
 
 RECENT_PROJECT_CACHE = os.path.join(tempfile.gettempdir(), 'ckprojects.json')
+METADATA_CACHE = {}  # Parsed metadata keyed by file path, see Project.getMetadata
 
 
 def santizePath(path):
@@ -21,12 +24,30 @@ def santizePath(path):
     Returns:
         str: A sanitized path.
     """
-    path = path.replace('\\\\', '/').replace('\\', '/')
+    # Most paths are already sanitized, so only replace separators when there are any
+    if '\\' in path:
+        path = path.replace('\\\\', '/').replace('\\', '/')
     if path.endswith('/'):
         path = path[:-1]
     return path
 
 
+@functools.lru_cache(maxsize=256)
+def _joinProjectPath(directory, path):
+    """
+    Joins and standardizes a project directory and a project local path.
+    Project getters resolve the same few paths repeatedly, so results are cached.
+
+    Args:
+        directory(str): A project directory path.
+        path(str): A project local file or directory path.
+
+    Returns:
+        str: The full file or directory path.
+    """
+    return santizePath(os.path.join(directory, path))
+
+
 # def addRecentProject(directory):
 #     """
 #     Adds a recent project to the recent project cache.
@@ -128,108 +149,123 @@ class ProjectDataKey(enum.Enum):
 
     @property
     def defaultValue(self):
-        return {
-            ProjectDataKey.controlJointMapping: {},
-            ProjectDataKey.exportScale: 1.0,
-            ProjectDataKey.exportPackageDirs: [],
-            ProjectDataKey.projectName: 'unnamed',
-        }.get(self, '')
+        return copy.copy(PROJECT_DATA_DEFAULTS.get(self, ''))
 
     @property
     def name(self):
-        return {
-            self.projectName: 'Project Name',
-            self.importSkeletonHkx: 'Import Skeleton Hkx',
-            self.importSkeletonNif: 'Import Skeleton Nif',
-            self.importCacheTxt: 'Import Cache Txt',
-            self.importAnimationDir: 'Import Animation Dir',
-            self.importBehaviorDir: 'Import Behavior Dir',
-            self.exportPackageDirs: 'Export Package Dirs',
-            self.exportDir: 'Export Dir',
-            self.exportJointName: 'Export Joint Name',
-            self.importJointName: 'Import Joint Name',
-            self.exportMeshName: 'Export Mesh Name',
-            self.exportSkeletonHkx: 'Export Skeleton Hkx',
-            self.exportSkeletonNif: 'Export Skeleton Nif',
-            self.exportSkinNif: 'Export Skin Nif',
-            self.exportCacheTxt: 'Export Cache Txt',
-            self.exportAnimationDir: 'Export Animation Dir',
-            self.exportBehaviorDir: 'Export Behavior Dir',
-            self.exportAnimationDataDir: 'Export Animation Data Dir',
-            self.exportScale: 'Export Scale',
-            self.controlJointMapping: 'Control Joint Mapping',
-            self.skeletonSceneFile: 'Skeleton Scene',
-            self.animationSceneDir: 'Animation Scene Dir',
-            self.textureDir: 'Texture Dir',
-            self.animationTagDir: 'Animation Tag Dir',
-            self.exportTextureDir: 'Export Texture Dir',
-            self.exportAnimationSkeletonHkx: 'Export Animation Skeleton'
-        }.get(self, self.value)
+        return PROJECT_DATA_NAMES.get(self, self.value)
 
     @property
     def category(self):
-        return {
-            self.projectName: ProjectDataCategory.General,
-            self.importSkeletonHkx: ProjectDataCategory.Import,
-            self.importSkeletonNif: ProjectDataCategory.Import,
-            self.importCacheTxt: ProjectDataCategory.Import,
-            self.importAnimationDir: ProjectDataCategory.Import,
-            self.importBehaviorDir: ProjectDataCategory.Import,
-            self.exportPackageDirs: ProjectDataCategory.Export,
-            self.exportDir: ProjectDataCategory.Export,
-            self.exportJointName: ProjectDataCategory.Export,
-            self.importJointName: ProjectDataCategory.Import,
-            self.exportMeshName: ProjectDataCategory.Export,
-            self.exportSkeletonHkx: ProjectDataCategory.Export,
-            self.exportSkeletonNif: ProjectDataCategory.Export,
-            self.exportSkinNif: ProjectDataCategory.Export,
-            self.exportCacheTxt: ProjectDataCategory.Export,
-            self.exportAnimationDir: ProjectDataCategory.Export,
-            self.exportBehaviorDir: ProjectDataCategory.Export,
-            self.exportAnimationDataDir: ProjectDataCategory.Export,
-            self.exportScale: ProjectDataCategory.Export,
-            self.exportTextureDir: ProjectDataCategory.Export,
-            self.exportAnimationSkeletonHkx: ProjectDataCategory.Export
-        }.get(self, ProjectDataCategory.General)
+        return PROJECT_DATA_CATEGORIES.get(self, ProjectDataCategory.General)
 
     @property
     def dataType(self):
-        return {
-            self.projectName: ProjectDataType.String,
-            self.importSkeletonHkx: ProjectDataType.HkxFile,
-            self.importSkeletonNif: ProjectDataType.NifFile,
-            self.importCacheTxt: ProjectDataType.TxtFile,
-            self.importAnimationDir: ProjectDataType.Directory,
-            self.importBehaviorDir: ProjectDataType.Directory,
-            self.controlJointMapping: ProjectDataType.StringMapping,
-            self.skeletonSceneFile: ProjectDataType.MayaFile,
-            self.animationSceneDir: ProjectDataType.Directory,
-            self.textureDir: ProjectDataType.Directory,
-            self.animationTagDir: ProjectDataType.Directory,
-            self.exportDir: ProjectDataType.Directory,
-            self.exportJointName: ProjectDataType.NodeName,
-            self.importJointName: ProjectDataType.NodeName,
-            self.exportMeshName: ProjectDataType.NodeName,
-            self.exportSkeletonHkx: ProjectDataType.HkxFile,
-            self.exportSkeletonNif: ProjectDataType.NifFile,
-            self.exportSkinNif: ProjectDataType.NifFile,
-            self.exportCacheTxt: ProjectDataType.TxtFile,
-            self.exportAnimationDir: ProjectDataType.Directory,
-            self.exportBehaviorDir: ProjectDataType.Directory,
-            self.exportAnimationDataDir: ProjectDataType.Directory,
-            self.exportScale: ProjectDataType.Float,
-            self.exportPackageDirs: ProjectDataType.DirectoryList,
-            self.exportTextureDir: ProjectDataType.Directory,
-            self.exportAnimationSkeletonHkx: ProjectDataType.HkxFile
-        }.get(self, ProjectDataType.String)
+        return PROJECT_DATA_TYPES.get(self, ProjectDataType.String)
 
     @property
     def description(self):
-        return {
-            self.exportAnimationSkeletonHkx: 'The legacy skeleton HKX file used for export animations.',
-            self.importJointName: 'The root joint of the skeleton used to import animation.',
-            self.exportJointName: 'The root joint of the skeleton used to export animation.',
-        }.get(self, '')
+        return PROJECT_DATA_DESCRIPTIONS.get(self, '')
+
+
+PROJECT_DATA_DEFAULTS = {
+    ProjectDataKey.controlJointMapping: {},
+    ProjectDataKey.exportScale: 1.0,
+    ProjectDataKey.exportPackageDirs: [],
+    ProjectDataKey.projectName: 'unnamed'
+}
+
+
+PROJECT_DATA_NAMES = {
+    ProjectDataKey.projectName: 'Project Name',
+    ProjectDataKey.importSkeletonHkx: 'Import Skeleton Hkx',
+    ProjectDataKey.importSkeletonNif: 'Import Skeleton Nif',
+    ProjectDataKey.importCacheTxt: 'Import Cache Txt',
+    ProjectDataKey.importAnimationDir: 'Import Animation Dir',
+    ProjectDataKey.importBehaviorDir: 'Import Behavior Dir',
+    ProjectDataKey.exportPackageDirs: 'Export Package Dirs',
+    ProjectDataKey.exportDir: 'Export Dir',
+    ProjectDataKey.exportJointName: 'Export Joint Name',
+    ProjectDataKey.importJointName: 'Import Joint Name',
+    ProjectDataKey.exportMeshName: 'Export Mesh Name',
+    ProjectDataKey.exportSkeletonHkx: 'Export Skeleton Hkx',
+    ProjectDataKey.exportSkeletonNif: 'Export Skeleton Nif',
+    ProjectDataKey.exportSkinNif: 'Export Skin Nif',
+    ProjectDataKey.exportCacheTxt: 'Export Cache Txt',
+    ProjectDataKey.exportAnimationDir: 'Export Animation Dir',
+    ProjectDataKey.exportBehaviorDir: 'Export Behavior Dir',
+    ProjectDataKey.exportAnimationDataDir: 'Export Animation Data Dir',
+    ProjectDataKey.exportScale: 'Export Scale',
+    ProjectDataKey.controlJointMapping: 'Control Joint Mapping',
+    ProjectDataKey.skeletonSceneFile: 'Skeleton Scene',
+    ProjectDataKey.animationSceneDir: 'Animation Scene Dir',
+    ProjectDataKey.textureDir: 'Texture Dir',
+    ProjectDataKey.animationTagDir: 'Animation Tag Dir',
+    ProjectDataKey.exportTextureDir: 'Export Texture Dir',
+    ProjectDataKey.exportAnimationSkeletonHkx: 'Export Animation Skeleton'
+}
+
+
+PROJECT_DATA_CATEGORIES = {
+    ProjectDataKey.projectName: ProjectDataCategory.General,
+    ProjectDataKey.importSkeletonHkx: ProjectDataCategory.Import,
+    ProjectDataKey.importSkeletonNif: ProjectDataCategory.Import,
+    ProjectDataKey.importCacheTxt: ProjectDataCategory.Import,
+    ProjectDataKey.importAnimationDir: ProjectDataCategory.Import,
+    ProjectDataKey.importBehaviorDir: ProjectDataCategory.Import,
+    ProjectDataKey.exportPackageDirs: ProjectDataCategory.Export,
+    ProjectDataKey.exportDir: ProjectDataCategory.Export,
+    ProjectDataKey.exportJointName: ProjectDataCategory.Export,
+    ProjectDataKey.importJointName: ProjectDataCategory.Import,
+    ProjectDataKey.exportMeshName: ProjectDataCategory.Export,
+    ProjectDataKey.exportSkeletonHkx: ProjectDataCategory.Export,
+    ProjectDataKey.exportSkeletonNif: ProjectDataCategory.Export,
+    ProjectDataKey.exportSkinNif: ProjectDataCategory.Export,
+    ProjectDataKey.exportCacheTxt: ProjectDataCategory.Export,
+    ProjectDataKey.exportAnimationDir: ProjectDataCategory.Export,
+    ProjectDataKey.exportBehaviorDir: ProjectDataCategory.Export,
+    ProjectDataKey.exportAnimationDataDir: ProjectDataCategory.Export,
+    ProjectDataKey.exportScale: ProjectDataCategory.Export,
+    ProjectDataKey.exportTextureDir: ProjectDataCategory.Export,
+    ProjectDataKey.exportAnimationSkeletonHkx: ProjectDataCategory.Export
+}
+
+
+PROJECT_DATA_TYPES = {
+    ProjectDataKey.projectName: ProjectDataType.String,
+    ProjectDataKey.importSkeletonHkx: ProjectDataType.HkxFile,
+    ProjectDataKey.importSkeletonNif: ProjectDataType.NifFile,
+    ProjectDataKey.importCacheTxt: ProjectDataType.TxtFile,
+    ProjectDataKey.importAnimationDir: ProjectDataType.Directory,
+    ProjectDataKey.importBehaviorDir: ProjectDataType.Directory,
+    ProjectDataKey.controlJointMapping: ProjectDataType.StringMapping,
+    ProjectDataKey.skeletonSceneFile: ProjectDataType.MayaFile,
+    ProjectDataKey.animationSceneDir: ProjectDataType.Directory,
+    ProjectDataKey.textureDir: ProjectDataType.Directory,
+    ProjectDataKey.animationTagDir: ProjectDataType.Directory,
+    ProjectDataKey.exportDir: ProjectDataType.Directory,
+    ProjectDataKey.exportJointName: ProjectDataType.NodeName,
+    ProjectDataKey.importJointName: ProjectDataType.NodeName,
+    ProjectDataKey.exportMeshName: ProjectDataType.NodeName,
+    ProjectDataKey.exportSkeletonHkx: ProjectDataType.HkxFile,
+    ProjectDataKey.exportSkeletonNif: ProjectDataType.NifFile,
+    ProjectDataKey.exportSkinNif: ProjectDataType.NifFile,
+    ProjectDataKey.exportCacheTxt: ProjectDataType.TxtFile,
+    ProjectDataKey.exportAnimationDir: ProjectDataType.Directory,
+    ProjectDataKey.exportBehaviorDir: ProjectDataType.Directory,
+    ProjectDataKey.exportAnimationDataDir: ProjectDataType.Directory,
+    ProjectDataKey.exportScale: ProjectDataType.Float,
+    ProjectDataKey.exportPackageDirs: ProjectDataType.DirectoryList,
+    ProjectDataKey.exportTextureDir: ProjectDataType.Directory,
+    ProjectDataKey.exportAnimationSkeletonHkx: ProjectDataType.HkxFile
+}
+
+
+PROJECT_DATA_DESCRIPTIONS = {
+    ProjectDataKey.exportAnimationSkeletonHkx: 'The legacy skeleton HKX file used for export animations.',
+    ProjectDataKey.importJointName: 'The root joint of the skeleton used to import animation.',
+    ProjectDataKey.exportJointName: 'The root joint of the skeleton used to export animation.'
+}
 
 
 class Project(object):
@@ -237,8 +273,11 @@ class Project(object):
     An object that handles project relative paths.
     """
 
+    __slots__ = ('_directory', '_directoryPrefix')
+
     def __init__(self, directory):
         self._directory = santizePath(directory)
+        self._directoryPrefix = self._directory + '/'
 
     def __repr__(self):
         """ Formats the project name. """
@@ -263,6 +302,16 @@ class Project(object):
             return filepath
         return None
 
+    def snapshot(self):
+        """
+        Gets a copy of the project that reads its metadata once.
+        Useful for operations that query many project paths in a row.
+
+        Returns:
+            ProjectSnapshot: A project snapshot.
+        """
+        return ProjectSnapshot(self.getDirectory())
+
     def getWorkspace(self):
         """
         Gets the projects workspace.mel file.
@@ -299,17 +348,35 @@ class Project(object):
         """
         return os.path.join(self.getDirectory(), 'metadata.json')
 
-    def getMetadata(self):
+    def _readMetadata(self):
         """
-        Gets metadata dictionary.
+        Gets the shared metadata dictionary, which must not be modified.
+
+        The parsed file is cached until its modification time or size changes.
 
         Returns:
             dict: A dictionary of metadata.
         """
-        if not os.path.exists(self.getMetadataFile()):
+        filepath = self.getMetadataFile()
+        try:
+            stat = os.stat(filepath)
+        except OSError:
             return {}
-        with open(self.getMetadataFile(), 'r') as openfile:
-            return json.load(openfile)
+        fileKey = (stat.st_mtime_ns, stat.st_size)
+        cached = METADATA_CACHE.get(filepath)
+        if cached is None or cached[0] != fileKey:
+            with open(filepath, 'r') as openfile:
+                cached = METADATA_CACHE[filepath] = (fileKey, json.load(openfile))
+        return cached[1]
+
+    def getMetadata(self):
+        """
+        Gets a copy of the metadata dictionary.
+
+        Returns:
+            dict: A dictionary of metadata.
+        """
+        return copy.deepcopy(self._readMetadata())
 
     def setMetadata(self, data):
         """
@@ -318,8 +385,15 @@ class Project(object):
         Args:
             data(dict): A dictionary of metadata.
         """
-        with open(self.getMetadataFile(), 'w+') as openfile:
-            json.dump(data, openfile, indent=4)
+        filepath = self.getMetadataFile()
+
+        # Write to a temporary file first so a failed write never leaves partial metadata
+        tempFilepath = f'{filepath}.tmp'
+        with open(tempFilepath, 'w') as openfile:
+            openfile.write(json.dumps(data, indent=4))
+        os.replace(tempFilepath, filepath)
+        stat = os.stat(filepath)
+        METADATA_CACHE[filepath] = ((stat.st_mtime_ns, stat.st_size), copy.deepcopy(data))
 
     def getMetadataKey(self, key):
         """
@@ -331,7 +405,15 @@ class Project(object):
         Returns:
             Any: The dictionary value.
         """
-        data = self.getMetadata().get(key.value, key.defaultValue)
+        # Only build the default value when the key is missing
+        metadata = self._readMetadata()
+        if key.value not in metadata:
+            data = key.defaultValue
+        elif isinstance(metadata[key.value], (dict, list)):
+            # Copy containers so callers can't modify the shared metadata
+            data = copy.deepcopy(metadata[key.value])
+        else:
+            data = metadata[key.value]
         if isinstance(data, str):
             data = santizePath(data)
         return data
@@ -344,11 +426,24 @@ class Project(object):
             key(ProjectDataKey): A metadata key.
             value(...): A metadata value.
         """
-        data = self.getMetadata()
-        if isinstance(value, str):
-            value = santizePath(value)
-        data[key.value] = value
-        self.setMetadata(data)
+        self.setMetadataKeys({key: value})
+
+    def setMetadataKeys(self, values):
+        """
+        Sets the values of multiple metadata keys with a single write.
+        The metadata file is only written if a value has changed.
+
+        Args:
+            values(dict): A mapping of metadata keys to values.
+        """
+        data = self._readMetadata()
+        newData = dict(data)
+        for key, value in values.items():
+            if isinstance(value, str):
+                value = santizePath(value)
+            newData[key.value] = value
+        if newData != data:
+            self.setMetadata(newData)
 
     def getExportPath(self, path):
         """
@@ -361,9 +456,11 @@ class Project(object):
             str: The project file or directory path.
         """
         path = santizePath(path)
-        if self.getDirectory() in path:
-            length = len(self.getExportDirectory().split('/'))
-            path = '/'.join(path.split('/')[length:])
+        exportDirectory = self.getExportDirectory()
+        if path == exportDirectory:
+            return ''
+        if path.startswith(exportDirectory + '/'):
+            return path[len(exportDirectory) + 1:]
         return path
 
     def getProjectPath(self, path):
@@ -377,9 +474,10 @@ class Project(object):
             str: The project file or directory path.
         """
         path = santizePath(path)
-        if self.getDirectory() in path:
-            length = len(self.getDirectory().split('/'))
-            path = '/'.join(path.split('/')[length:])
+        if path == self._directory:
+            return ''
+        if path.startswith(self._directoryPrefix):
+            return path[len(self._directoryPrefix):]
         return path
 
     def getFullPath(self, path):
@@ -392,7 +490,7 @@ class Project(object):
         Returns:
             str: The full file or directory path.
         """
-        return santizePath(os.path.join(self.getDirectory(), path))
+        return _joinProjectPath(self.getDirectory(), path)
 
     # ---- Import ---- #
 
@@ -571,15 +669,76 @@ class Project(object):
     # ---- Control Joints ---- #
     def getControlJointMapping(self): return self.getMetadataKey(ProjectDataKey.controlJointMapping)
     def setControlJointMapping(self, mapping): self.setMetadataKey(ProjectDataKey.controlJointMapping, mapping)
-    def setControlJoint(self, control, joint):
-        mapping = self.getControlJointMapping()
-        mapping[control] = joint
-        self.setControlJointMapping(mapping)
+    def setControlJoint(self, control, joint): self.setControlJoints({control: joint})
+    def setControlJoints(self, mapping):
+        data = self.getMetadata()
+        data.setdefault(ProjectDataKey.controlJointMapping.value, {}).update(mapping)
+        self.setMetadata(data)
     def getControlJoint(self, control): return self.getControlJointMapping().get(control)
     def getJointControls(self, joint):
         return [control for control, _joint in self.getControlJointMapping().items() if joint == _joint]
 
 
+class ProjectSnapshot(Project):
+    """
+    A project that caches its metadata when created.
+    Metadata written through the snapshot updates both the file and the cache.
+    """
+
+    __slots__ = ('_metadata', '_jointControls')
+
+    def __init__(self, directory):
+        super(ProjectSnapshot, self).__init__(directory)
+        self._metadata = super(ProjectSnapshot, self)._readMetadata()
+        self._jointControls = None
+
+    def snapshot(self):
+        """
+        Gets the project snapshot.
+
+        Returns:
+            ProjectSnapshot: A project snapshot.
+        """
+        return self
+
+    def _readMetadata(self):
+        """
+        Gets the cached metadata dictionary, which must not be modified.
+
+        Returns:
+            dict: A dictionary of metadata.
+        """
+        return self._metadata
+
+    def setMetadata(self, data):
+        """
+        Sets the project metadata and updates the cache.
+
+        Args:
+            data(dict): A dictionary of metadata.
+        """
+        super(ProjectSnapshot, self).setMetadata(data)
+        self._metadata = copy.deepcopy(data)
+        self._jointControls = None
+
+    def getJointControls(self, joint):
+        """
+        Gets the controls mapped to a joint.
+        The reverse mapping is built once and reused until the metadata is set.
+
+        Args:
+            joint(str): A joint name.
+
+        Returns:
+            list[str]: A list of control names.
+        """
+        if self._jointControls is None:
+            self._jointControls = {}
+            for control, _joint in self.getControlJointMapping().items():
+                self._jointControls.setdefault(_joint, []).append(control)
+        return list(self._jointControls.get(joint, []))
+
+
 def getSceneName():
     """
     Gets the file path of the current scene.
@@ -600,6 +759,26 @@ def isProject(path):
     Returns:
         bool: Whether the path is a project.
     """
+    try:
+        modified = os.stat(path).st_mtime_ns
+    except OSError:
+        return False
+    return _isProjectDirectory(path, modified)
+
+
+@functools.lru_cache(maxsize=256)
+def _isProjectDirectory(path, modified):
+    """
+    Determines if a directory contains the project files.
+    Results are cached by the directories modification time, which changes when files are added or removed.
+
+    Args:
+        path(str): A directory path.
+        modified(int): The directories modification time in nanoseconds.
+
+    Returns:
+        bool: Whether the directory is a project.
+    """
     for projectFile in ['workspace.mel', 'metadata.json']:
         if not os.path.exists(os.path.join(path, projectFile)):
             return False
@@ -618,13 +797,13 @@ def getProject(path=None):
         Project: A project object.
     """
     if path is None:
-        # Return the current workspace
+        # Return the current workspace, which is usually the project root itself
         workspace = cmds.workspace(rd=True, q=True)
-        project = getProject(workspace)
-        if project is not None:
-            return project
-
-        return None
+        if not workspace:
+            return None
+        if isProject(workspace):
+            return Project(workspace)
+        return getProject(workspace)
     elif isinstance(path, Project):
         # If the path is a project object, return it
         return path
@@ -633,12 +812,12 @@ def getProject(path=None):
         if isProject(path):
             return Project(path)
 
-        # Otherwise search parent directories for a project
-        head, tail = os.path.split(path)
-        while tail != '':
-            if isProject(head):
-                return Project(head)
-            head, tail = os.path.split(head)
+        # Otherwise search parent directories for a project, stopping at the root
+        head, parent = path, os.path.dirname(path)
+        while parent != head:
+            if isProject(parent):
+                return Project(parent)
+            head, parent = parent, os.path.dirname(parent)
 
         return None
 
@@ -651,7 +830,15 @@ def getRecentProjects():
         list[str]: A list of project directories.
     """
     maxSize = cmds.optionVar(q='RecentProjectsMaxSize')
-    return [directory for directory in cmds.optionVar(q='RecentProjectsList') if isProject(directory)][:maxSize]
+
+    # Only check as many directories as will be returned
+    projects = []
+    for directory in cmds.optionVar(q='RecentProjectsList') or []:
+        if len(projects) >= maxSize:
+            break
+        if isProject(directory):
+            projects.append(directory)
+    return projects
 
 
 def setProject(directory=None):
@@ -674,6 +861,17 @@ def setProject(directory=None):
     return
 
 
+@functools.lru_cache(maxsize=1)
+def _getMayaVersion():
+    """
+    Gets the version of the running Maya session.
+
+    Returns:
+        str: A Maya version.
+    """
+    return cmds.about(v=True)
+
+
 def createProject(directory, name):
     """
     Creates a new project directory.
@@ -686,13 +884,8 @@ def createProject(directory, name):
     Returns:
         Project: The newly created project.
     """
-    def createFolder(path):
-        """ Creates a directory if it does not exist. """
-        if not os.path.exists(path):
-            os.makedirs(path)
-
     # Create the project directory if it does not exist
-    createFolder(directory)
+    os.makedirs(directory, exist_ok=True)
 
     # Create the project meta data
     with open(os.path.join(directory, 'metadata.json'), 'w+') as openfile:
@@ -702,40 +895,34 @@ def createProject(directory, name):
     workspaceFile = os.path.join(directory, 'workspace.mel')
     if not os.path.exists(workspaceFile):
         with open(os.path.join(directory, 'workspace.mel'), 'w+') as openfile:
-            openfile.write('//Maya %s Project Definition' % cmds.about(v=True))
+            openfile.write('//Maya %s Project Definition' % _getMayaVersion())
 
     # Set the project
     cmds.workspace(directory, o=True)
 
     # Create File Rules
-    for rule in [['mayaAscii', 'scenes'], ['mayaBinary', 'scenes'], ['scene', 'scenes'],
-                 ['animation', 'scenes/animations'], ['texture', 'textures']]:
+    fileRules = [['mayaAscii', 'scenes'], ['mayaBinary', 'scenes'], ['scene', 'scenes'],
+                 ['animation', 'scenes/animations'], ['texture', 'textures']]
+    for rule in fileRules:
         cmds.workspace(fr=rule)
-        createFolder(os.path.join(directory, rule[1]))
 
-    # Create Data Directories
-    for folder in [
-        'data',
-        'data/textures',
-        'data/textures/actors',
+    # Create Directories, parent directories are created along with their children
+    folders = {rule[1] for rule in fileRules}
+    folders.update([
         'data/textures/actors/%s' % name,
-        'data',
-        'data/meshes',
-        'data/meshes/animationdata',
         'data/meshes/animationdata/boundanims',
-        'data/meshes/animationsetdata',
         'data/meshes/animationsetdata/%sprojectdata' % name,
-        'data/meshes/actors',
-        'data/meshes/actors/%s' % name,
         'data/meshes/actors/%s/animations' % name,
         'data/meshes/actors/%s/behaviors' % name,
         'data/meshes/actors/%s/character assets' % name,
         'data/meshes/actors/%s/characters' % name,
-    ]:
-        createFolder(os.path.join(directory, folder))
+    ])
+    for folder in sorted(folders):
+        os.makedirs(os.path.join(directory, folder), exist_ok=True)
 
     # Save the project
     cmds.workspace(directory, s=True)
+    _isProjectDirectory.cache_clear()
 
     return Project(directory)
 
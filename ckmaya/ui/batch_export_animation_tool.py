@@ -96,13 +96,14 @@ class BatchExportAnimationTool(ProjectWindow):
             return
 
         # Export each scene
-        for file in files:
-            try:
-                cmds.file(file, o=True, force=True, prompt=False)
-            except:
-                pass
-            ckcore.exportSceneAnimation(self.formatBox.currentText())
-            # ckcore.exportAnimation(format=self.formatBox.currentText())
+        with ckcore.suspendRefresh():
+            for file in files:
+                try:
+                    cmds.file(file, o=True, force=True, prompt=False)
+                except Exception as ex:
+                    cmds.warning('Errors opening %s: %s' % (file, ex))
+                ckcore.exportSceneAnimation(self.formatBox.currentText())
+                # ckcore.exportAnimation(format=self.formatBox.currentText())
 
         ckcore.exportPackage()
 
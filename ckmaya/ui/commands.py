@@ -77,8 +77,8 @@ def convertTextures():
         fileTypes=['png', 'tga'],
         title='Select Texture Files'
     )
+    ckcore.convertTextures(textures)
     for texture in textures:
-        ckcore.convertTexture(texture)
         print ('Converted %s' % texture)
 
 
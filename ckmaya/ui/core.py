@@ -219,6 +219,10 @@ def saveChangesDialog():
     Returns:
         bool: Whether to continue or not.
     """
+    # There is nothing to save if the scene is unmodified
+    if not cmds.file(q=True, modified=True):
+        return True
+
     result = cmds.confirmDialog(
         title='Save Changes',
         message='Save changes to %s?' % getSceneName(),
@@ -1416,8 +1420,14 @@ class ProjectModel(QtCore.QObject):
         """
         if self._project is None:
             return
-        for key in ckproject.ProjectDataKey:
-            self.setData(key, self._project.getMetadataKey(key))
+
+        # Read every key from one snapshot and write any missing defaults back once
+        project = self._project.snapshot()
+        values = {key: project.getMetadataKey(key) for key in ckproject.ProjectDataKey}
+        project.setMetadataKeys(values)
+        for key, value in values.items():
+            self._data[key] = value
+            self.dataChanged.emit(key, value)
 
     def getData(self, key, default=None):
         """
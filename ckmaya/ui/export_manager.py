@@ -436,12 +436,13 @@ class AnimationTab(ProjectTab):
             return
 
         # Export each scene
-        for file in files:
-            try:
-                cmds.file(file, o=True, force=True, prompt=False)
-            except:
-                pass
-            ckcore.exportAnimation(format=self.formatBox.currentText())
+        with ckcore.suspendRefresh():
+            for file in files:
+                try:
+                    cmds.file(file, o=True, force=True, prompt=False)
+                except Exception as ex:
+                    cmds.warning('Errors opening %s: %s' % (file, ex))
+                ckcore.exportAnimation(format=self.formatBox.currentText())
 
 
 class RiggingTab(ProjectTab):